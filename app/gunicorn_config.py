@@ -2,16 +2,20 @@
 Gunicorn configuration file for production deployment.
 
 This file contains production settings for Gunicorn server.
-Usage: gunicorn -c gunicorn_config.py wsgi:application
+Usage: gunicorn -c app/gunicorn_config.py wsgi:application
 """
+import os
 
 # Server socket
-bind = "0.0.0.0:5000"
+bind = "0.0.0.0:" + os.environ.get("PORT", "5000")
 backlog = 2048
 
 # Worker processes
+# gthread workers serve several requests per process, so while one thread waits
+# on SQLite (WAL allows concurrent readers alongside a writer) others keep going.
 workers = 4
-worker_class = "sync"
+worker_class = "gthread"
+threads = 8
 worker_connections = 1000
 timeout = 30
 keepalive = 2
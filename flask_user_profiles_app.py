@@ -2,7 +2,7 @@
 Single-file Flask application to register, view and update user profiles.
 - Uses Flask + Flask-WTF for forms and validation.
 - Stores data in a SQLite database file `users.db`.
-- Templates are embedded; a helper injects content into BASE safely.
+- Templates are embedded and served through a DictLoader; pages extend BASE.
 
 Run:
     pip install Flask Flask-WTF email-validator
@@ -10,12 +10,20 @@ Run:
 
 Then open http://127.0.0.1:5000/
 """
-from flask import Flask, g, render_template_string, redirect, url_for, request, flash
+from flask import Flask, g, render_template, redirect, url_for, request, flash
+from jinja2 import DictLoader
 from flask_wtf import FlaskForm
 from wtforms import StringField, IntegerField, TextAreaField, SubmitField
 from wtforms.validators import DataRequired, Email, Length, NumberRange
+import hashlib
 import sqlite3
-import os
+import queue
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, schema creation is still idempotent
+    fcntl = None
 
 # -------------------- Configuration --------------------
 DB_PATH = 'users.db'
@@ -23,31 +31,83 @@ SECRET_KEY = 'dev-secret-key-change-me'
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = SECRET_KEY
+# Static files are served with a one-year max-age; the ?v= hash in their URLs
+# changes whenever the CSS does, so browsers never keep a stale copy.
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 31536000
+
+# -------------------- SQL statements --------------------
+# Defined once so pooled connections reuse SQLite's prepared-statement cache.
+_SQL_LIST_USERS = 'SELECT id, username, full_name, email FROM users ORDER BY id DESC'
+_SQL_GET_USER = 'SELECT * FROM users WHERE id = ?'
+# The update view loads the (up to 500 char) bio separately and only on GET.
+_SQL_GET_USER_WITHOUT_BIO = 'SELECT id, username, full_name, email, age FROM users WHERE id = ?'
+_SQL_GET_USER_BIO = 'SELECT bio FROM users WHERE id = ?'
+_SQL_INSERT_USER = 'INSERT INTO users (username, full_name, email, age, bio) VALUES (?, ?, ?, ?, ?)'
+_SQL_UPDATE_USER = 'UPDATE users SET username = ?, full_name = ?, email = ?, age = ?, bio = ? WHERE id = ?'
+_SQL_COUNT_USERS = 'SELECT COUNT(*) FROM users'
 
 # -------------------- Database helpers --------------------
+# Long-lived connections are reused across requests so SQLite's page cache
+# and statement cache survive; a request checks one out and returns it on teardown.
+POOL_SIZE = 8
+_POOL = queue.LifoQueue(maxsize=POOL_SIZE)
+# WAL + synchronous=NORMAL: one write per commit instead of FULL's extra fsync.
+# A crash right after a commit may lose that last transaction (fine for this app).
+CONNECTION_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-64000',
+)
+
+def _open_connection():
+    """Open a new pooled connection with dict-like rows and tuned PRAGMAs."""
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+def _release_connection(conn):
+    """Return a connection to the pool, closing it if the pool is full."""
+    try:
+        _POOL.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
 def get_db():
-    """Return a sqlite3 connection (attached to flask.g) with dict-like rows."""
+    """
+    Return a pooled sqlite3 connection (attached to flask.g) with dict-like rows.
+    Pooled connections are in autocommit mode: each statement commits on its own.
+    """
     db = getattr(g, '_database', None)
     if db is None:
-        db = sqlite3.connect(DB_PATH)
-        db.row_factory = sqlite3.Row
+        try:
+            db = _POOL.get_nowait()
+        except queue.Empty:
+            db = _open_connection()
         g._database = db
     return db
 
 @app.teardown_appcontext
 def close_connection(exception):
-    """Close DB connection at the end of the request."""
-    db = getattr(g, '_database', None)
+    """Return the DB connection to the pool at the end of the request."""
+    db = g.pop('_database', None)
     if db is not None:
-        db.close()
+        _release_connection(db)
 
 def init_db():
-    """Create users table if it doesn't exist."""
-    if not os.path.exists(DB_PATH):
+    """
+    Create users table if it doesn't exist.
+    Safe to call from several workers at once: CREATE TABLE IF NOT EXISTS is
+    idempotent and an exclusive lock on a sentinel file serializes the callers.
+    """
+    with open(DB_PATH + '.lock', 'w') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
         conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute('''
-            CREATE TABLE users (
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS users (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 username TEXT NOT NULL UNIQUE,
                 full_name TEXT NOT NULL,
@@ -58,40 +118,39 @@ def init_db():
         ''')
         conn.commit()
         conn.close()
-        print('Initialized database at', DB_PATH)
+
+_db_initialized = False
+
+def create_app():
+    """
+    Return the application, creating the schema once per process first.
+    Point WSGI servers here (e.g. gunicorn 'flask_user_profiles_app:create_app()')
+    so every worker has the schema before it serves a request.
+    """
+    global _db_initialized
+    if not _db_initialized:
+        init_db()
+        _db_initialized = True
+    return app
 
 # -------------------- Forms --------------------
 class ProfileForm(FlaskForm):
     username = StringField('Username', validators=[DataRequired(), Length(min=3, max=30)])
     full_name = StringField('Full name', validators=[DataRequired(), Length(min=2, max=100)])
-    email = StringField('Email', validators=[DataRequired(), Email(), Length(max=120)])
+    email = StringField('Email', validators=[DataRequired(), Email(check_deliverability=False), Length(max=120)])
     age = IntegerField('Age', validators=[NumberRange(min=0, max=120)], default=None)
     bio = TextAreaField('Bio', validators=[Length(max=500)])
     submit = SubmitField('Save')
 
 # -------------------- Templates --------------------
-# BASE contains a placeholder {{ content|safe }} where page-specific content will be injected.
-BASE = """
-<!doctype html>
+# BASE is the shared layout; each page fills in its {% block content %}.
+BASE = """<!doctype html>
 <html lang="en">
 <head>
   <meta charset="utf-8">
   <meta name="viewport" content="width=device-width,initial-scale=1">
   <title>Flask Profiles</title>
-  <style>
-    body{font-family:Arial,Helvetica,sans-serif;margin:2rem}
-    .container{max-width:800px;margin:auto}
-    label{display:block;margin-top:0.5rem}
-    input, textarea{width:100%;padding:0.5rem;margin-top:0.25rem}
-    .flash{padding:0.5rem;border-radius:4px;margin-bottom:1rem}
-    .flash.success{background:#e6ffed;border:1px solid #b6f2c7}
-    .flash.error{background:#ffe6e6;border:1px solid #f2b6b6}
-    .card{border:1px solid #ddd;padding:1rem;border-radius:6px;margin-bottom:1rem}
-    .small{font-size:0.9rem;color:#555}
-    .actions{margin-top:1rem}
-    .btn{display:inline-block;padding:0.5rem 1rem;border-radius:4px;text-decoration:none;background:#1976d2;color:white}
-    .error-text{color:#b00020}
-  </style>
+  <link rel="stylesheet" href="{{ url_for('static', filename='app.css', v=static_version) }}">
 </head>
 <body>
   <div class="container">
@@ -103,26 +162,22 @@ BASE = """
         {% endfor %}
       {% endif %}
     {% endwith %}
-    {{ content|safe }}
+    {% block content %}{% endblock %}
   </div>
 </body>
 </html>
 """
 
-# Small helper to render a page: render child template string into BASE.
-def render_page(content_template_str, **context):
-    """
-    Render a content template string with context, then inject into BASE.
-    This avoids fragile use of Jinja inheritance with render_template_string.
-    """
-    # First render the content fragment (so `form`, `url_for`, etc. are resolved)
-    rendered_content = render_template_string(content_template_str, **context)
-    # Now render BASE with the rendered content injected
-    return render_template_string(BASE, content=rendered_content)
-
+# Shared macros; page templates import them with {% from "macros.html" import ... %}.
+# errs() renders a field's validation errors, skipping the loop when there are none.
+MACROS = """{% macro errs(field) -%}
+  {% if field.errors %}{% for err in field.errors %}<div class="small error-text">{{ err }}</div>{% endfor %}{% endif %}
+{%- endmacro %}
+"""
 
-# Now each template is only the page-specific content (no extends).
-INDEX_TEMPLATE = """
+# Each page template extends BASE and only provides its content block.
+INDEX_TEMPLATE = """{% extends "base.html" %}
+{% block content %}
   <div class="actions">
     <a class="btn" href="{{ url_for('register') }}">Register new user</a>
   </div>
@@ -141,42 +196,47 @@ INDEX_TEMPLATE = """
   {% else %}
     <p>No users yet. Be the first to register.</p>
   {% endif %}
+{% endblock %}
 """
 
-REGISTER_TEMPLATE = """
+REGISTER_TEMPLATE = """{% extends "base.html" %}
+{% from "macros.html" import errs %}
+{% block content %}
   <h2>Register</h2>
   <form method="post">
     {{ form.hidden_tag() }}
     <label>Username
       {{ form.username(size=30) }}
-      {% for err in form.username.errors %}<div class="small error-text">{{ err }}</div>{% endfor %}
+      {{ errs(form.username) }}
     </label>
 
     <label>Full name
       {{ form.full_name(size=60) }}
-      {% for err in form.full_name.errors %}<div class="small error-text">{{ err }}</div>{% endfor %}
+      {{ errs(form.full_name) }}
     </label>
 
     <label>Email
       {{ form.email(size=60) }}
-      {% for err in form.email.errors %}<div class="small error-text">{{ err }}</div>{% endfor %}
+      {{ errs(form.email) }}
     </label>
 
     <label>Age
       {{ form.age() }}
-      {% for err in form.age.errors %}<div class="small error-text">{{ err }}</div>{% endfor %}
+      {{ errs(form.age) }}
     </label>
 
     <label>Bio
       {{ form.bio(rows=4) }}
-      {% for err in form.bio.errors %}<div class="small error-text">{{ err }}</div>{% endfor %}
+      {{ errs(form.bio) }}
     </label>
 
     <div style="margin-top:1rem">{{ form.submit() }}</div>
   </form>
+{% endblock %}
 """
 
-PROFILE_TEMPLATE = """
+PROFILE_TEMPLATE = """{% extends "base.html" %}
+{% block content %}
   <h2>{{ user['full_name'] }} ({{ user['username'] }})</h2>
   <div class="card">
     <div><strong>Email:</strong> {{ user['email'] }}</div>
@@ -189,51 +249,103 @@ PROFILE_TEMPLATE = """
       <a href="{{ url_for('index') }}">Back to list</a>
     </div>
   </div>
+{% endblock %}
 """
 
-UPDATE_TEMPLATE = """
+UPDATE_TEMPLATE = """{% extends "base.html" %}
+{% from "macros.html" import errs %}
+{% block content %}
   <h2>Update {{ user['full_name'] }} ({{ user['username'] }})</h2>
   <form method="post">
     {{ form.hidden_tag() }}
 
     <label>Username
       {{ form.username(size=30) }}
-      {% for err in form.username.errors %}<div class="small error-text">{{ err }}</div>{% endfor %}
+      {{ errs(form.username) }}
     </label>
 
     <label>Full name
       {{ form.full_name(size=60) }}
-      {% for err in form.full_name.errors %}<div class="small error-text">{{ err }}</div>{% endfor %}
+      {{ errs(form.full_name) }}
     </label>
 
     <label>Email
       {{ form.email(size=60) }}
-      {% for err in form.email.errors %}<div class="small error-text">{{ err }}</div>{% endfor %}
+      {{ errs(form.email) }}
     </label>
 
     <label>Age
       {{ form.age() }}
-      {% for err in form.age.errors %}<div class="small error-text">{{ err }}</div>{% endfor %}
+      {{ errs(form.age) }}
     </label>
 
     <label>Bio
       {{ form.bio(rows=4) }}
-      {% for err in form.bio.errors %}<div class="small error-text">{{ err }}</div>{% endfor %}
+      {{ errs(form.bio) }}
     </label>
 
     <div style="margin-top:1rem">{{ form.submit() }}</div>
   </form>
   <p class="small"><a href="{{ url_for('profile', user_id=user['id']) }}">Cancel</a></p>
+{% endblock %}
 """
 
+# Serve the embedded templates by name so render_template() can use them;
+# Jinja compiles each one once and caches it. The .html suffix keeps autoescaping on.
+app.jinja_loader = DictLoader({
+    'base.html': BASE,
+    'macros.html': MACROS,
+    'index.html': INDEX_TEMPLATE,
+    'register.html': REGISTER_TEMPLATE,
+    'profile.html': PROFILE_TEMPLATE,
+    'update.html': UPDATE_TEMPLATE,
+})
+
+# -------------------- User list cache --------------------
+# The index page is read far more often than users change, so its rows are
+# kept per process for a short TTL and dropped whenever a user is saved.
+# Only the rows are cached, not the page: it also renders flashed messages.
+_USERS_TTL = 2.0
+_users_cache = {'ts': 0.0, 'rows': None}
+
+def get_user_list():
+    """Return the index listing, re-querying at most once per _USERS_TTL seconds."""
+    now = time.monotonic()
+    if _users_cache['rows'] is None or now - _users_cache['ts'] >= _USERS_TTL:
+        _users_cache['rows'] = get_db().execute(_SQL_LIST_USERS).fetchall()
+        _users_cache['ts'] = now
+    return _users_cache['rows']
+
+def invalidate_user_list():
+    """Force the next index request to reload the user list."""
+    _users_cache['rows'] = None
+
+# -------------------- Static assets --------------------
+def _static_version(filename):
+    """Short content hash used to bust the browser cache when a file changes."""
+    with app.open_resource('static/' + filename) as f:
+        return hashlib.md5(f.read(), usedforsecurity=False).hexdigest()[:8]
+
+STATIC_VERSION = _static_version('app.css')
+
+@app.context_processor
+def inject_static_version():
+    return {'static_version': STATIC_VERSION}
+
+@app.after_request
+def mark_static_immutable(response):
+    """Tell browsers versioned static files never change at the same URL."""
+    if request.endpoint == 'static' and response.status_code == 200:
+        response.cache_control.immutable = True
+    return response
+
 # -------------------- Routes & Views --------------------
 
 @app.route('/')
 def index():
     """Show a simple list of users with links to view or edit each profile."""
-    db = get_db()
-    users = db.execute('SELECT id, username, full_name, email FROM users ORDER BY id DESC').fetchall()
-    return render_page(INDEX_TEMPLATE, users=users)
+    users = get_user_list()
+    return render_template('index.html', users=users)
 
 @app.route('/register', methods=['GET', 'POST'])
 def register():
@@ -245,7 +357,7 @@ def register():
             age_value = form.age.data if form.age.data is not None else None
             bio_value = (form.bio.data or '').strip()
             db.execute(
-                'INSERT INTO users (username, full_name, email, age, bio) VALUES (?, ?, ?, ?, ?)',
+                _SQL_INSERT_USER,
                 ( (form.username.data or '').strip(),
                   (form.full_name.data or '').strip(),
                   (form.email.data or '').strip(),
@@ -253,28 +365,28 @@ def register():
                   bio_value
                 )
             )
-            db.commit()
+            invalidate_user_list()
             flash('User registered successfully.', 'success')
             return redirect(url_for('index'))
         except sqlite3.IntegrityError:
             flash('Error saving user: username or email might already exist.', 'error')
-    return render_page(REGISTER_TEMPLATE, form=form)
+    return render_template('register.html', form=form)
 
 @app.route('/profile/<int:user_id>')
 def profile(user_id):
     """Show stored user data dynamically from the DB."""
     db = get_db()
-    user = db.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
+    user = db.execute(_SQL_GET_USER, (user_id,)).fetchone()
     if not user:
         flash('User not found', 'error')
         return redirect(url_for('index'))
-    return render_page(PROFILE_TEMPLATE, user=user)
+    return render_template('profile.html', user=user)
 
 @app.route('/update/<int:user_id>', methods=['GET', 'POST'])
 def update(user_id):
     """Preload user data into the update form and save changes on POST."""
     db = get_db()
-    user = db.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
+    user = db.execute(_SQL_GET_USER_WITHOUT_BIO, (user_id,)).fetchone()
     if not user:
         flash('User not found', 'error')
         return redirect(url_for('index'))
@@ -286,13 +398,18 @@ def update(user_id):
         form.full_name.data = user['full_name']
         form.email.data = user['email']
         form.age.data = user['age']
-        form.bio.data = user['bio']
+        bio_row = db.execute(_SQL_GET_USER_BIO, (user_id,)).fetchone()
+        if bio_row is None:
+            # The user was deleted between the two queries
+            flash('User not found', 'error')
+            return redirect(url_for('index'))
+        form.bio.data = bio_row['bio']
     elif form.validate_on_submit():
         try:
             age_value = form.age.data if form.age.data is not None else None
             bio_value = (form.bio.data or '').strip()
             db.execute(
-                'UPDATE users SET username = ?, full_name = ?, email = ?, age = ?, bio = ? WHERE id = ?',
+                _SQL_UPDATE_USER,
                 ( (form.username.data or '').strip(),
                   (form.full_name.data or '').strip(),
                   (form.email.data or '').strip(),
@@ -301,31 +418,35 @@ def update(user_id):
                   user_id
                 )
             )
-            db.commit()
+            invalidate_user_list()
             flash('User updated successfully.', 'success')
             return redirect(url_for('profile', user_id=user_id))
         except sqlite3.IntegrityError:
             flash('Error updating user: username or email might conflict with an existing user.', 'error')
 
-    return render_page(UPDATE_TEMPLATE, form=form, user=user)
+    return render_template('update.html', form=form, user=user)
 
 # -------------------- Application entry point --------------------
+# Example data inserted when the database is empty.
+SAMPLE_ROWS = [
+    ('jdoe', 'John Doe', 'jdoe@example.com', 34, 'A short bio about John.'),
+    ('asmith', 'Alice Smith', 'alice@example.com', 28, 'Alice loves coding and coffee.'),
+]
+
 if __name__ == '__main__':
-    init_db()
+    create_app()
     # Insert example data if there are no users (helps demonstrate update flow quickly).
     db = sqlite3.connect(DB_PATH)
     c = db.cursor()
     try:
-        c.execute('SELECT COUNT(*) FROM users')
+        c.execute(_SQL_COUNT_USERS)
         count = c.fetchone()[0]
     except sqlite3.Error:
         count = 0
     if count == 0:
-        c.execute('INSERT INTO users (username, full_name, email, age, bio) VALUES (?, ?, ?, ?, ?)',
-                  ('jdoe', 'John Doe', 'jdoe@example.com', 34, 'A short bio about John.'))
-        c.execute('INSERT INTO users (username, full_name, email, age, bio) VALUES (?, ?, ?, ?, ?)',
-                  ('asmith', 'Alice Smith', 'alice@example.com', 28, 'Alice loves coding and coffee.'))
-        db.commit()
+        # One executemany in one transaction: the journal is written once for all rows.
+        with db:
+            c.executemany(_SQL_INSERT_USER, SAMPLE_ROWS)
         print('Inserted sample users.')
     db.close()
 
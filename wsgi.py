@@ -0,0 +1,14 @@
+"""
+WSGI entry point for production servers.
+
+Usage:
+    gunicorn -c app/gunicorn_config.py wsgi:application
+or, without the config file:
+    gunicorn -k gthread --threads 8 --workers 4 wsgi:app
+
+Use run.py (Flask's development server) only for local development.
+"""
+from app import create_app
+
+application = create_app()
+app = application